@@ -0,0 +1,178 @@
+import httpx
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from scan_downloader import HEADERS, page_url
+
+
+DEFAULT_STATE_FILE = "scans/followed.json"
+
+# Consecutive chapter numbers probed before concluding there is nothing newer
+GAP_WINDOW = 3
+
+
+def load_state(state_file: str = DEFAULT_STATE_FILE) -> Dict[str, int]:
+    """Load the followed series and their last known chapter"""
+    path = Path(state_file)
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        return {name: int(chapter) for name, chapter in json.load(f).items()}
+
+
+def save_state(state: Dict[str, int], state_file: str = DEFAULT_STATE_FILE):
+    path = Path(state_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(dict(sorted(state.items())), f, indent=2)
+
+
+def local_last_chapter(manga_name: str, output_dir: str = "scans") -> int:
+    """Highest chapter downloaded in <output_dir>/<manga_name>/, 0 if none"""
+    manga_dir = Path(output_dir) / manga_name
+    if not manga_dir.is_dir():
+        return 0
+    chapters = [int(m.group(1)) for f in manga_dir.iterdir()
+                if (m := re.match(r'ch(\d+)_p\d+\.', f.name))]
+    return max(chapters, default=0)
+
+
+def chapter_exists(client: httpx.Client, manga_name: str, chapter_number: int) -> bool:
+    """Check with a HEAD request whether the first page of a chapter exists"""
+    url = page_url(manga_name, chapter_number, 1)
+    response = client.head(url)
+    if response.status_code == 405:
+        # HEAD not allowed, only read the headers of a GET
+        with client.stream("GET", url) as response:
+            pass
+    if response.status_code == 404:
+        return False
+    response.raise_for_status()
+    return True
+
+
+def find_latest_chapter(client: httpx.Client, manga_name: str, last_known: int,
+                        gap_window: int = GAP_WINDOW) -> int:
+    """
+    Find the latest chapter available on the site, starting from the last known one.
+    Looks for a chapter in the next gap_window numbers, then probes +1, +2, +4, ...
+    and bisects, so only a few requests are needed even when many chapters were
+    released. The window is probed again after each bisection, so a missing
+    chapter number inside the range does not stop the search.
+
+    Limitation: a gap of gap_window or more consecutive missing chapters right
+    after the last chapter found hides the chapters that follow it.
+    """
+    probed = {}
+
+    def exists(chapter_number):
+        if chapter_number not in probed:
+            probed[chapter_number] = chapter_exists(client, manga_name, chapter_number)
+        return probed[chapter_number]
+
+    found = last_known
+    while True:
+        following = next((c for c in range(found + 1, found + gap_window + 1) if exists(c)), None)
+        if following is None:
+            return found
+
+        found = following
+        step = 1
+        while exists(found + step):
+            found += step
+            step *= 2
+        missing = found + step
+
+        # Only chapters that were found move the lower bound
+        while missing - found > 1:
+            middle = (found + missing) // 2
+            if exists(middle):
+                found = middle
+            else:
+                missing = middle
+
+
+def check_updates(series: Dict[str, int], concurrency: int = 32) -> List[dict]:
+    """
+    Compare the last known chapter of each series with the site, without
+    downloading any page.
+
+    Args:
+        series (Dict[str, int]): Normalized manga name -> last known chapter
+        concurrency (int): Number of series checked at the same time
+
+    Returns:
+        List[dict]: One entry per series with 'name', 'last_known', 'latest',
+                    'new' (number of new chapters) and 'error' (None if ok)
+    """
+    concurrency = max(1, concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    with httpx.Client(headers=HEADERS, timeout=10, limits=limits) as client:
+        def check(item):
+            name, last_known = item
+            try:
+                latest = find_latest_chapter(client, name, last_known)
+                return {'name': name, 'last_known': last_known, 'latest': latest,
+                        'new': latest - last_known, 'error': None}
+            except httpx.HTTPError as e:
+                return {'name': name, 'last_known': last_known, 'latest': None,
+                        'new': 0, 'error': str(e)}
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(check, sorted(series.items())))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check followed series for new chapters without downloading them.")
+    parser.add_argument("manga_names", nargs="*",
+                        help="series to check (default: every series of the state file)")
+    parser.add_argument("-s", "--state", default=DEFAULT_STATE_FILE,
+                        help=f"last known chapter per series (default: {DEFAULT_STATE_FILE})")
+    parser.add_argument("-o", "--output-dir", default="scans",
+                        help="scans folder used when a series is not in the state file (default: scans)")
+    parser.add_argument("-j", "--concurrency", type=int, default=32,
+                        help="series checked in parallel (default: 32)")
+    parser.add_argument("-u", "--update", action="store_true",
+                        help="store the latest chapters in the state file")
+    parser.add_argument("--json", action="store_true", help="print the diff as JSON")
+    args = parser.parse_args(argv)
+
+    state = load_state(args.state)
+    names = args.manga_names or list(state)
+    if not names:
+        parser.error(f"no series given and {args.state} is empty")
+    series = {name: state[name] if name in state else local_last_chapter(name, args.output_dir)
+              for name in names}
+
+    start_time = time.monotonic()
+    results = check_updates(series, args.concurrency)
+    duration = time.monotonic() - start_time
+
+    if args.json:
+        print(json.dumps([r for r in results if r['new'] or r['error']]))
+    else:
+        for r in results:
+            if r['error']:
+                print(f"❌ {r['name']}: {r['error']}")
+            elif r['new']:
+                print(f"{r['name']}: {r['last_known']} -> {r['latest']} (+{r['new']})")
+        updated = sum(1 for r in results if r['new'])
+        print(f"{updated}/{len(results)} series with new chapters ({duration:.1f}s)")
+
+    if args.update:
+        for r in results:
+            if not r['error']:
+                state[r['name']] = r['latest']
+        save_state(state, args.state)
+
+    return 1 if any(r['error'] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
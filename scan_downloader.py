@@ -1,25 +1,55 @@
 import httpx
 import urllib.parse
 from pathlib import Path
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple, Union
+import argparse
+import json
+import sys
 import time
 import random
+from verify_scans import QUEUE_FILENAME, verify_image
 
 
-def download_with_retry(url, headers, max_retries=5):
-    """Download with retry logic and exponential backoff"""
+BASE_URL = "https://anime-sama.fr"
+
+HEADERS = {
+    'Referer': 'https://anime-sama.fr/catalogue/hajime-no-ippo/scan/vf/',
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36',
+    'sec-ch-ua': '"Not;A=Brand";v="99", "Google Chrome";v="139", "Chromium";v="139"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"macOS"'
+}
+
+
+def page_url(manga_name: str, chapter_number: int, page_number: int, img_type: str = "jpg") -> str:
+    """Build the URL of a single scan page"""
+    encoded_manga = urllib.parse.quote(manga_name)
+    return f"{BASE_URL}/s2/scans/{encoded_manga}/{chapter_number}/{page_number}.{img_type}"
+
+
+def page_filename(chapter_number: int, page_number: int, img_type: str = "jpg") -> str:
+    """Local filename of a scan page, e.g. ch001_p001.jpg"""
+    return f"ch{chapter_number:03d}_p{page_number:03d}.{img_type}"
+
+
+def download_with_retry(url, headers, max_retries=5, client=None):
+    """Download with retry logic and exponential backoff, reusing client's connections if given"""
+    get = client.get if client is not None else httpx.get
     for attempt in range(max_retries):
         try:
-            response = httpx.get(url, headers=headers, timeout=30)
+            response = get(url, headers=headers, timeout=30)
             return response
         except (httpx.RemoteProtocolError, httpx.ConnectError, httpx.TimeoutException, 
                 httpx.ReadTimeout, httpx.NetworkError) as e:
             if attempt == max_retries - 1:
-                print(f"Failed after {max_retries} attempts: {e}")
+                print(f"Failed after {max_retries} attempts: {e}", file=sys.stderr)
                 raise
             
             wait_time = (2 ** attempt) + random.uniform(0, 1)  # Exponential backoff with jitter
-            print(f"Network error on attempt {attempt + 1}: {e}")
-            print(f"Retrying in {wait_time:.1f} seconds...")
+            print(f"Network error on attempt {attempt + 1}: {e}", file=sys.stderr)
+            print(f"Retrying in {wait_time:.1f} seconds...", file=sys.stderr)
             time.sleep(wait_time)
 
 def scan_downloader(manga_name: str):
@@ -50,18 +80,11 @@ def scan_downloader(manga_name: str):
     img_type = "jpg"
 
 
-    headers = {
-        'Referer': 'https://anime-sama.fr/catalogue/hajime-no-ippo/scan/vf/',
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36',
-        'sec-ch-ua': '"Not;A=Brand";v="99", "Google Chrome";v="139", "Chromium";v="139"',
-        'sec-ch-ua-mobile': '?0',
-        'sec-ch-ua-platform': '"macOS"'
-    }
+    headers = HEADERS
 
     while chapter_number <= max_chapter:
         # Build URL
-        encoded_manga = urllib.parse.quote(manga_name)
-        url = f"https://anime-sama.fr/s2/scans/{encoded_manga}/{chapter_number}/{page_number}.{img_type}"
+        url = page_url(manga_name, chapter_number, page_number, img_type)
         
         print(f"Downloading: Chapter {chapter_number}, Page {page_number}")
         
@@ -71,7 +94,7 @@ def scan_downloader(manga_name: str):
         if response.status_code == 200: # type: ignore
             # Save the image
             Path(f"scans/{manga_name}").mkdir(exist_ok=True)
-            filename = f"ch{chapter_number:03d}_p{page_number:03d}.{img_type}"
+            filename = page_filename(chapter_number, page_number, img_type)
 
             with open(f"scans/{manga_name}/{filename}", "wb") as f:
                 f.write(response.content) # type: ignore
@@ -103,3 +126,324 @@ def scan_downloader(manga_name: str):
     with open(f"scans/{manga_name}/progress.txt", "w") as f:
         f.write(f"Completed")
     print("Download complete!")
+
+
+ChapterRange = Tuple[int, Optional[int]]
+
+
+def parse_chapter_ranges(spec: str) -> List[ChapterRange]:
+    """
+    Parse a chapter range set such as "1-50,75,100-".
+
+    Args:
+        spec (str): Comma separated chapters or ranges, an open range ("100-")
+                    means "until the last chapter available on the site"
+
+    Returns:
+        List[ChapterRange]: (start, end) tuples, end is None for open ranges
+    """
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                start, end = part.split("-", 1)
+                start = int(start)
+                end = int(end) if end.strip() else None
+            else:
+                start = end = int(part)
+        except ValueError:
+            raise ValueError(f"Invalid chapter range: '{part}'")
+        if start < 1 or (end is not None and end < start):
+            raise ValueError(f"Invalid chapter range: '{part}'")
+        ranges.append((start, end))
+
+    if not ranges:
+        raise ValueError("No chapter given")
+    return ranges
+
+
+@dataclass
+class DownloadResult:
+    """Summary of a download_chapters run"""
+    manga_name: str
+    chapters: List[int] = field(default_factory=list)
+    pages: int = 0
+    skipped: int = 0
+    bytes: int = 0
+    failures: List[dict] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def merge(self, other: "DownloadResult"):
+        self.chapters.extend(other.chapters)
+        self.pages += other.pages
+        self.skipped += other.skipped
+        self.bytes += other.bytes
+        self.failures.extend(other.failures)
+
+    def to_dict(self) -> dict:
+        return {
+            'manga_name': self.manga_name,
+            'chapters': sorted(self.chapters),
+            'pages': self.pages,
+            'skipped': self.skipped,
+            'bytes': self.bytes,
+            'failures': self.failures,
+            'duration': round(self.duration, 3),
+        }
+
+
+def download_chapter(manga_name: str, chapter_number: int, output_dir: str = "scans",
+                     img_type: str = "jpg", max_consecutive_errors: int = 5,
+                     quiet: bool = False, client: Optional[httpx.Client] = None) -> DownloadResult:
+    """
+    Download every page of a chapter until the site answers 404.
+    Pages already present on disk are skipped.
+
+    Returns:
+        DownloadResult: chapters is empty if the chapter does not exist
+    """
+    result = DownloadResult(manga_name)
+    manga_dir = Path(output_dir) / manga_name
+    page_number = 1
+    errors = 0
+
+    while errors < max_consecutive_errors:
+        path = manga_dir / page_filename(chapter_number, page_number, img_type)
+        if path.exists() and path.stat().st_size > 0:
+            result.skipped += 1
+            page_number += 1
+            continue
+
+        url = page_url(manga_name, chapter_number, page_number, img_type)
+        try:
+            response = download_with_retry(url, HEADERS, client=client)
+        except httpx.HTTPError as e:
+            result.failures.append({'chapter': chapter_number, 'page': page_number, 'error': str(e)})
+            errors += 1
+            page_number += 1
+            continue
+
+        if response.status_code == 200: # type: ignore
+            manga_dir.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(response.content) # type: ignore
+            result.pages += 1
+            result.bytes += len(response.content) # type: ignore
+            errors = 0
+            if not quiet:
+                print(f"Saved: {manga_name}/{path.name}")
+        elif response.status_code == 404: # type: ignore
+            break
+        else:
+            result.failures.append({'chapter': chapter_number, 'page': page_number,
+                                    'error': f"HTTP {response.status_code}"}) # type: ignore
+            errors += 1
+        page_number += 1
+
+    # Failed pages alone do not prove that the chapter exists
+    if result.pages or result.skipped:
+        result.chapters.append(chapter_number)
+        if not quiet:
+            print(f"Completed {manga_name} Chapter {chapter_number} ({result.pages + result.skipped} pages)")
+    return result
+
+
+def redownload_queued(manga_name: str, output_dir: str = "scans", quiet: bool = False,
+                      client: Optional[httpx.Client] = None) -> DownloadResult:
+    """
+    Download the pages listed in <output_dir>/<manga_name>/redownload.txt
+    (written by verify_scans for corrupted pages). Pages that fail, or whose
+    new bytes are not a valid image, stay queued. Pages that the site now
+    answers 404 for are dropped from the queue and reported once.
+
+    Returns:
+        DownloadResult: Pages re-downloaded and failures
+    """
+    result = DownloadResult(manga_name)
+    manga_dir = Path(output_dir) / manga_name
+    queue_file = manga_dir / QUEUE_FILENAME
+    if not queue_file.exists():
+        return result
+
+    queued = []
+    with open(queue_file, "r") as f:
+        for line in f:
+            try:
+                chapter_number, page_number, img_type = line.split()
+                queued.append((int(chapter_number), int(page_number), img_type))
+            except ValueError:
+                if line.strip():
+                    print(f"Ignoring malformed line in {queue_file}: {line.strip()!r}", file=sys.stderr)
+
+    remaining = []
+    for chapter_number, page_number, img_type in queued:
+        url = page_url(manga_name, chapter_number, page_number, img_type)
+        try:
+            response = download_with_retry(url, HEADERS, client=client)
+            error = None if response.status_code == 200 else f"HTTP {response.status_code}" # type: ignore
+        except httpx.HTTPError as e:
+            error = str(e)
+            response = None
+
+        if response is not None and response.status_code == 404:
+            # Gone from the site: retrying on every run would never succeed
+            result.failures.append({'chapter': chapter_number, 'page': page_number,
+                                    'error': "HTTP 404, dropped from the re-download queue"})
+            continue
+
+        if error:
+            result.failures.append({'chapter': chapter_number, 'page': page_number, 'error': error})
+            remaining.append(f"{chapter_number} {page_number} {img_type}\n")
+            continue
+
+        # Check the new bytes before replacing the corrupted page
+        path = manga_dir / page_filename(chapter_number, page_number, img_type)
+        part_path = path.with_name(path.name + ".part")
+        part_path.write_bytes(response.content) # type: ignore
+        error = verify_image(str(part_path))
+        if error:
+            part_path.unlink()
+            result.failures.append({'chapter': chapter_number, 'page': page_number, 'error': error})
+            remaining.append(f"{chapter_number} {page_number} {img_type}\n")
+            continue
+
+        part_path.replace(path)
+        result.pages += 1
+        result.bytes += len(response.content) # type: ignore
+        if not quiet:
+            print(f"Re-downloaded: {manga_name}/{path.name}")
+
+    if remaining:
+        with open(queue_file, "w") as f:
+            f.writelines(remaining)
+    else:
+        queue_file.unlink()
+    return result
+
+
+def download_chapters(manga_name: str, chapters: Union[str, List[ChapterRange]] = "1-",
+                      output_dir: str = "scans",
+                      concurrency: int = 4, img_type: str = "jpg",
+                      max_consecutive_errors: int = 5, max_missing: int = 5,
+                      quiet: bool = False) -> DownloadResult:
+    """
+    Non-interactive download of a set of chapters, several chapters in parallel.
+
+    Args:
+        manga_name (str): Normalized name of the manga (e.g. 'hajime-no-ippo')
+        chapters: Range set string ("1-50,75,100-") or parse_chapter_ranges output
+        output_dir (str): Root folder, pages are saved in <output_dir>/<manga_name>/
+        concurrency (int): Number of chapters downloaded at the same time
+        img_type (str): Image extension requested on the site
+        max_consecutive_errors (int): Give up on a chapter after this many failed pages
+        max_missing (int): Open ranges end after this many consecutive missing
+                           chapters, so gaps in the numbering are skipped
+        quiet (bool): Do not print progress
+
+    Returns:
+        DownloadResult: Pages, bytes, failures and duration of the run
+    """
+    if isinstance(chapters, str):
+        chapters = parse_chapter_ranges(chapters)
+    concurrency = max(1, concurrency)
+    max_missing = max(1, max_missing)
+
+    start_time = time.monotonic()
+    done = set()
+    # One keep-alive connection per worker instead of a new one per page
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    client = httpx.Client(headers=HEADERS, limits=limits)
+
+    def fetch(chapter_number):
+        return download_chapter(manga_name, chapter_number, output_dir, img_type,
+                                max_consecutive_errors, quiet, client)
+
+    with client, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Pages flagged as corrupted by verify_scans come first
+        result = redownload_queued(manga_name, output_dir, quiet, client)
+
+        # Bounded ranges: every chapter number is known upfront
+        bounded = sorted({c for start, end in chapters if end is not None
+                          for c in range(start, end + 1)})
+        for chapter_result in executor.map(fetch, bounded):
+            result.merge(chapter_result)
+        done.update(bounded)
+
+        # Open ranges: go batch by batch until max_missing chapters in a row are missing
+        for start, end in chapters:
+            if end is not None:
+                continue
+            chapter_number = start
+            missing = 0
+            while missing < max_missing:
+                batch = [c for c in range(chapter_number, chapter_number + concurrency) if c not in done]
+                chapter_number += concurrency
+                if not batch:
+                    continue
+                batch_results = list(executor.map(fetch, batch))
+                for chapter_result in batch_results:
+                    result.merge(chapter_result)
+                    if chapter_result.chapters:
+                        missing = 0
+                    elif not chapter_result.failures:
+                        # Clean 404 on the first page
+                        missing += 1
+                done.update(batch)
+                # Nothing but failures (site down, blocked...): stop instead of walking forever
+                if all(r.failures and not r.chapters for r in batch_results):
+                    result.failures.append({'chapter': batch[0], 'page': None,
+                                            'error': f"open range {start}- stopped, chapters "
+                                                     f"{batch[0]}-{batch[-1]} only failed"})
+                    break
+
+    result.duration = time.monotonic() - start_time
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Download scans from anime-sama.fr without prompts.")
+    parser.add_argument("manga_name", help="normalized manga name, e.g. hajime-no-ippo")
+    parser.add_argument("-c", "--chapters", default="1-",
+                        help="chapter range set, e.g. '1-50,75,100-' (default: all)")
+    parser.add_argument("-o", "--output-dir", default="scans", help="root output folder (default: scans)")
+    parser.add_argument("-j", "--concurrency", type=int, default=4,
+                        help="chapters downloaded in parallel (default: 4)")
+    parser.add_argument("-f", "--format", default="jpg", choices=["jpg", "png", "webp"],
+                        help="image extension requested on the site (default: jpg)")
+    parser.add_argument("--max-errors", type=int, default=5,
+                        help="consecutive failed pages before giving up a chapter (default: 5)")
+    parser.add_argument("--max-missing", type=int, default=5,
+                        help="consecutive missing chapters that end an open range (default: 5)")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print progress")
+    args = parser.parse_args(argv)
+
+    try:
+        chapters = parse_chapter_ranges(args.chapters)
+    except ValueError as e:
+        parser.error(str(e))
+
+    result = download_chapters(args.manga_name, chapters, args.output_dir, args.concurrency,
+                               args.format, args.max_errors, args.max_missing,
+                               args.quiet or args.json)
+
+    if args.json:
+        print(json.dumps(result.to_dict()))
+    else:
+        print(f"{result.manga_name}: {len(result.chapters)} chapters, {result.pages} pages "
+              f"({result.bytes / (1024 * 1024):.2f} MB), {result.skipped} skipped, "
+              f"{len(result.failures)} failures in {result.duration:.1f}s")
+        for failure in result.failures:
+            page = f", Page {failure['page']}" if failure['page'] is not None else ""
+            print(f"  ❌ Chapter {failure['chapter']}{page}: {failure['error']}")
+    return 0 if result.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
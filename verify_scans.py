@@ -0,0 +1,226 @@
+from PIL import Image
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import argparse
+import json
+import re
+import sys
+import time
+
+
+CACHE_FILENAME = ".verify_cache.json"
+QUEUE_FILENAME = "redownload.txt"
+
+# Extensions d'images supportées (comme split_images)
+VALID_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+# Anything smaller cannot be a real scan page
+MIN_SIZE = 256
+
+
+def _check_magic(header: bytes) -> Optional[str]:
+    """Return the detected image format from the first bytes of a file"""
+    if header.startswith(b'\xff\xd8\xff'):
+        return "jpeg"
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return "png"
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return "webp"
+    if header.startswith(b'BM'):
+        return "bmp"
+    return None
+
+
+def verify_image(path: str, full_decode: bool = False) -> Optional[str]:
+    """
+    Check that a file is a complete image.
+
+    Args:
+        path (str): Image to check
+        full_decode (bool): Also decode every pixel (slow but catches corrupted data)
+
+    Returns:
+        Optional[str]: None if the image is valid, the reason otherwise
+    """
+    end_marker_missing = False
+    try:
+        with open(path, "rb") as f:
+            header = f.read(16)
+            f.seek(0, 2)
+            size = f.tell()
+            f.seek(max(0, size - 64))
+            tail = f.read()
+
+        if size < MIN_SIZE:
+            return f"too small ({size} bytes)"
+
+        image_format = _check_magic(header)
+        if image_format is None:
+            if header.lstrip().lower().startswith((b'<!doctype', b'<html', b'<?xml', b'{')):
+                return "not an image (HTML/text body)"
+            return "unknown magic bytes"
+
+        # Truncated downloads lose their end marker. Valid files may still have
+        # trailing data after it, so a missing marker only forces a full decode
+        # and Pillow decides.
+        end_marker_missing = ((image_format == "jpeg" and b'\xff\xd9' not in tail)
+                              or (image_format == "png" and b'IEND' not in tail))
+
+        with Image.open(path) as img:
+            img.verify()
+        if full_decode or end_marker_missing:
+            with Image.open(path) as img:
+                img.load()
+    except Exception as e:
+        if end_marker_missing:
+            return f"truncated ({e})"
+        return f"decode error: {e}"
+    return None
+
+
+def _verify_worker(args: Tuple[str, bool]) -> Optional[str]:
+    return verify_image(*args)
+
+
+def _load_cache(cache_path: Path) -> dict:
+    try:
+        with open(cache_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def verify_tree(root: str = "scans", manga_names: Optional[List[str]] = None,
+                full_decode: bool = False, workers: Optional[int] = None,
+                use_cache: bool = True) -> List[Tuple[Path, str]]:
+    """
+    Verify every image under root with a process pool.
+    Results are cached per file (mtime/size) in <root>/.verify_cache.json,
+    so unchanged files are not checked again.
+
+    Args:
+        root (str): Scans folder
+        manga_names (Optional[List[str]]): Only check these series
+        full_decode (bool): Fully decode each image
+        workers (Optional[int]): Number of processes (default: CPU count)
+        use_cache (bool): Read the cache of previous runs
+
+    Returns:
+        List[Tuple[Path, str]]: Corrupted files and the reason
+    """
+    root_path = Path(root)
+    folders = [root_path / name for name in manga_names] if manga_names else [root_path]
+    files = sorted(f for folder in folders if folder.is_dir() for f in folder.rglob("*")
+                   if f.is_file() and f.suffix.lower() in VALID_EXTENSIONS)
+
+    cache_path = root_path / CACHE_FILENAME
+    cache = _load_cache(cache_path) if use_cache else {}
+    new_cache = {key: entry for key, entry in _load_cache(cache_path).items()
+                 if (root_path / key).exists()}
+
+    corrupted = []
+    to_check = []
+    for f in files:
+        key = f.relative_to(root_path).as_posix()
+        stat = f.stat()
+        entry = cache.get(key)
+        # Entry: [mtime_ns, size, full_decode, reason]
+        if (entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size
+                and (entry[2] or not full_decode)):
+            new_cache[key] = entry
+            if entry[3]:
+                corrupted.append((f, entry[3]))
+        else:
+            to_check.append((f, key, stat))
+
+    if to_check:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            reasons = executor.map(_verify_worker, [(str(f), full_decode) for f, _, _ in to_check],
+                                   chunksize=32)
+            for (f, key, stat), reason in zip(to_check, reasons):
+                new_cache[key] = [stat.st_mtime_ns, stat.st_size, full_decode, reason]
+                if reason:
+                    corrupted.append((f, reason))
+
+    root_path.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, "w") as f:
+        json.dump(new_cache, f)
+
+    return sorted(corrupted)
+
+
+def queue_redownload(corrupted: List[Tuple[Path, str]], root: str = "scans") -> List[str]:
+    """
+    Add corrupted pages to <root>/<manga>/redownload.txt (one
+    "chapter page img_type" per line), which download_chapters processes
+    before anything else. Files are kept until a valid copy replaces them.
+
+    Returns:
+        List[str]: Series with queued pages
+    """
+    root_path = Path(root)
+    queues = {}
+    for path, _ in corrupted:
+        match = re.fullmatch(r'ch(\d+)_p(\d+)\.(\w+)', path.name)
+        if not match or path.parent.parent != root_path:
+            continue
+        chapter_number, page_number, img_type = match.groups()
+        queues.setdefault(path.parent, set()).add((int(chapter_number), int(page_number), img_type))
+
+    for manga_dir, pages in queues.items():
+        queue_file = manga_dir / QUEUE_FILENAME
+        if queue_file.exists():
+            with open(queue_file, "r") as f:
+                for line in f:
+                    try:
+                        chapter_number, page_number, img_type = line.split()
+                        pages.add((int(chapter_number), int(page_number), img_type))
+                    except ValueError:
+                        # Malformed line, dropped when the queue is rewritten
+                        continue
+        with open(queue_file, "w") as f:
+            for chapter_number, page_number, img_type in sorted(pages):
+                f.write(f"{chapter_number} {page_number} {img_type}\n")
+
+    return sorted(manga_dir.name for manga_dir in queues)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Verify downloaded scans and queue corrupted pages for re-download.")
+    parser.add_argument("manga_names", nargs="*", help="series to verify (default: the whole scans folder)")
+    parser.add_argument("-r", "--root", default="scans", help="scans folder (default: scans)")
+    parser.add_argument("--full", action="store_true", help="fully decode each image (slower)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="number of processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="check every file again")
+    parser.add_argument("--redownload", action="store_true",
+                        help="re-download the queued pages right away")
+    args = parser.parse_args(argv)
+
+    start_time = time.monotonic()
+    corrupted = verify_tree(args.root, args.manga_names, args.full, args.workers, not args.no_cache)
+    for path, reason in corrupted:
+        print(f"❌ {path}: {reason}")
+    print(f"{len(corrupted)} corrupted file(s) ({time.monotonic() - start_time:.1f}s)")
+
+    queued = queue_redownload(corrupted, args.root)
+    for manga_name in queued:
+        print(f"Queued for re-download: {manga_name}")
+
+    if args.redownload and queued:
+        from scan_downloader import redownload_queued
+        failures = 0
+        for manga_name in queued:
+            result = redownload_queued(manga_name, args.root)
+            failures += len(result.failures)
+            print(f"{manga_name}: {result.pages} page(s) re-downloaded, {len(result.failures)} failure(s)")
+        print(f"{failures} page(s) still not repaired")
+        # Repaired pages no longer count, only what could not be fixed
+        return 1 if failures else 0
+
+    return 1 if corrupted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())